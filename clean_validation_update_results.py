@@ -1,9 +1,11 @@
+import heapq
 import math
 import re
 import statistics
 import string
 from collections import Counter
 from copy import deepcopy
+from operator import itemgetter
 
 from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
 
@@ -26,6 +28,17 @@ def load_pdfs(path: str = "."):
 
 # ---------- Metrics / helpers ----------
 
+# str.translate deletion tables; counting via translate keeps the
+# per-character loop inside CPython instead of a Python generator.
+_ASCII_TABLE = str.maketrans("", "", "".join(chr(i) for i in range(128)))
+_PUNCT_TABLE = str.maketrans("", "", string.punctuation)
+
+# clean_text patterns, compiled once at import rather than on every call.
+_HYPHEN_BREAK_RE = re.compile(r"-\s*\n")
+_EXCESS_NEWLINES_RE = re.compile(r"\n{3,}")
+_SPACE_RUN_RE = re.compile(r"[ \t]+")
+
+
 def shannon_entropy(text: str) -> float:
     """
     Estimate Shannon entropy of the given text.
@@ -45,7 +58,7 @@ def is_non_ascii_heavy(text: str, threshold_ratio: float = 0.05) -> bool:
     """
     if not text:
         return False
-    non_ascii = sum(1 for c in text if ord(c) > 127)
+    non_ascii = len(text.translate(_ASCII_TABLE))
     return (non_ascii / len(text)) > threshold_ratio
 
 
@@ -56,7 +69,7 @@ def punctuation_density(text: str) -> float:
     """
     if not text:
         return 0.0
-    punct = sum(1 for c in text if c in string.punctuation)
+    punct = len(text) - len(text.translate(_PUNCT_TABLE))
     return punct / len(text)
 
 
@@ -78,16 +91,16 @@ def clean_text(text: str) -> str:
         return ""
 
     # Remove hyphen + line break (e.g., "interoperabil-\nity" -> "interoperability")
-    text = re.sub(r"-\s*\n", "", text)
+    text = _HYPHEN_BREAK_RE.sub("", text)
 
     # Normalize Windows / Mac newlines just in case
     text = text.replace("\r\n", "\n").replace("\r", "\n")
 
     # Collapse 3+ newlines to 2 (keeps paragraph breaks but removes crazy spacing)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _EXCESS_NEWLINES_RE.sub("\n\n", text)
 
     # Collapse multiple spaces/tabs into a single space
-    text = re.sub(r"[ \t]+", " ", text)
+    text = _SPACE_RUN_RE.sub(" ", text)
 
     # Strip leading/trailing whitespace
     text = text.strip()
@@ -166,7 +179,7 @@ def validate_docs(docs, label: str = "CLEANLINESS VALIDATION"):
         print(f"  Found {len(repeated)} chunk texts that repeat > 3 times.")
         print("  This may indicate headers/footers or boilerplate not removed.")
         # Show a few examples
-        for i, (txt, c) in enumerate(sorted(repeated, key=lambda x: -x[1])[:5]):
+        for i, (txt, c) in enumerate(heapq.nlargest(5, repeated, key=itemgetter(1))):
             preview = txt.replace("\n", " ")[:120]
             print(f"    #{i+1} repeat_count={c} preview='{preview}...'")
 
@@ -184,10 +197,6 @@ def validate_docs(docs, label: str = "CLEANLINESS VALIDATION"):
     # ---- Weird character / OCR artifact checks ----
     print("\n[CHARS] Checking for weird / non-ASCII / OCR characters...")
 
-    ligature_pattern = re.compile(r"[ﬁﬂ]")
-    replacement_char_pattern = re.compile(r"[�]")
-    hyphen_break_pattern = re.compile(r"-\n")
-
     ligature_hits = 0
     replacement_hits = 0
     hyphen_break_hits = 0
@@ -195,11 +204,11 @@ def validate_docs(docs, label: str = "CLEANLINESS VALIDATION"):
 
     for d in docs:
         text = d.page_content or ""
-        if ligature_pattern.search(text):
+        if "ﬁ" in text or "ﬂ" in text:
             ligature_hits += 1
-        if replacement_char_pattern.search(text):
+        if "\ufffd" in text:
             replacement_hits += 1
-        if hyphen_break_pattern.search(text):
+        if "-\n" in text:
             hyphen_break_hits += 1
         if is_non_ascii_heavy(text):
             non_ascii_heavy_hits += 1
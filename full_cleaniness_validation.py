@@ -1,50 +1,194 @@
+import hashlib
+import heapq
 import math
-import re
-import statistics
+import os
 import string
-from collections import Counter
+from collections import Counter, deque
+from contextlib import closing, nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
 
-from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
+import numpy as np
+import pymupdf
+from langchain_community.document_loaders import PyMuPDFLoader
+from langchain_core.documents import Document
 
 
 # ---------- Loader ----------
 
+# Page-count tiers for load_pdfs, checked in order as (max_pages, strategy):
+#   inline - tiny files; parsing in-process beats a worker round-trip
+#   pool   - medium files; one worker task per file
+#   pages  - huge files; split into PAGES_PER_TASK page ranges so a single
+#            file spreads across the pool and no worker returns it whole
+PDF_LOAD_TIERS = (
+    (10, "inline"),
+    (200, "pool"),
+    (math.inf, "pages"),
+)
+PAGES_PER_TASK = 50
+
+
+def _page_count(path: Path) -> int:
+    with pymupdf.open(path) as pdf:
+        return pdf.page_count
+
+
+def _load_strategy(page_count: int) -> str:
+    return next(strategy for max_pages, strategy in PDF_LOAD_TIERS if page_count < max_pages)
+
+
+def _load_pdf(path: Path):
+    return PyMuPDFLoader(str(path)).load()
+
+
+def _load_pdf_pages(path: Path, start: int, stop: int):
+    """
+    Load pages [start, stop) of one PDF. Page text is extracted and stripped
+    as PyMuPDFLoader does; metadata carries source, file_path, total_pages,
+    the PDF's own info fields and the page number.
+    """
+    with pymupdf.open(path) as pdf:
+        file_metadata = {
+            "source": str(path),
+            "file_path": str(path),
+            "total_pages": pdf.page_count,
+        } | {k: v for k, v in pdf.metadata.items() if isinstance(v, (str, int))}
+        return [
+            Document(
+                page_content=page.get_text().strip(),
+                metadata=file_metadata | {"page": page.number},
+            )
+            for page in pdf.pages(start, stop)
+        ]
+
+
+_TASK_LOADERS = {"inline": _load_pdf, "pool": _load_pdf, "pages": _load_pdf_pages}
+
+
+def _load_tasks(files):
+    for f in files:
+        page_count = _page_count(f)
+        strategy = _load_strategy(page_count)
+        if strategy == "pages":
+            for start in range(0, page_count, PAGES_PER_TASK):
+                yield strategy, (f, start, min(start + PAGES_PER_TASK, page_count))
+        else:
+            yield strategy, (f,)
+
+
+def iter_pdfs(path: str = "."):
+    """
+    Lazily yield LangChain Documents for all PDFs under the given path.
+    Files are parsed with PyMuPDF, routed by page count through
+    PDF_LOAD_TIERS, and yielded in sorted file and page order. Only a
+    bounded number of pooled tasks are parsed ahead of the consumer.
+    """
+    root = Path(path)
+    # Skip hidden files and directories (.git, .venv, ...), as DirectoryLoader did.
+    files = sorted(
+        f for f in root.rglob("*.pdf")
+        if not any(part.startswith(".") for part in f.relative_to(root).parts)
+    )
+    tasks = list(_load_tasks(files))
+    pooled = ((strategy, args) for strategy, args in tasks if strategy != "inline")
+    workers = os.cpu_count() or 1
+
+    in_flight = {}
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        try:
+            for strategy, args in tasks:
+                while len(in_flight) < 2 * workers and (nxt := next(pooled, None)) is not None:
+                    nxt_strategy, nxt_args = nxt
+                    in_flight[nxt_args] = ex.submit(_TASK_LOADERS[nxt_strategy], *nxt_args)
+                if strategy == "inline":
+                    yield from _load_pdf(*args)
+                else:
+                    yield from in_flight.pop(args).result()
+        finally:
+            # If the consumer stops early, drop queued tasks instead of
+            # parsing files nobody will read.
+            ex.shutdown(cancel_futures=True)
+
+
 def load_pdfs(path: str = "."):
     """
     Load all PDFs recursively from the given path into LangChain Documents.
     """
-    loader = DirectoryLoader(
-        path=path,
-        glob="**/*.pdf",
-        loader_cls=PyPDFLoader,
-    )
-    docs = loader.load()
+    docs = list(iter_pdfs(path))
     print(f"[LOAD] Loaded {len(docs)} documents from {path}")
     return docs
 
 
 # ---------- Metrics / helpers ----------
 
+# One 256-entry byte class table; each bit marks a character class.
+# Every non-ASCII code point starts with exactly one UTF-8 lead byte
+# (0xC0-0xFF), so counting lead bytes counts non-ASCII characters.
+# Ligatures and the replacement char span several bytes that also occur
+# in other characters, so they are matched on the text instead.
+_PUNCT, _NEWLINE, _NON_ASCII = range(3)
+_CLASS_LUT = np.zeros(256, dtype=np.uint8)
+_CLASS_LUT[np.frombuffer(string.punctuation.encode("ascii"), dtype=np.uint8)] |= 1 << _PUNCT
+_CLASS_LUT[0x0A] |= 1 << _NEWLINE
+_CLASS_LUT[0xC0:] |= 1 << _NON_ASCII
+# (256, n_classes) 0/1 matrix: byte histogram @ _CLASS_MATRIX gives every
+# class count at once.
+_CLASS_MATRIX = ((_CLASS_LUT[:, None] >> np.arange(3)) & 1).astype(np.int64)
+
+
+def _byte_histogram(text: str) -> np.ndarray:
+    data = np.frombuffer(text.encode("utf-8", "ignore"), dtype=np.uint8)
+    return np.bincount(data, minlength=256)
+
+
+def _class_counts(text: str) -> np.ndarray:
+    return _byte_histogram(text) @ _CLASS_MATRIX
+
+
+def _byte_entropy(counts: np.ndarray) -> float:
+    p = counts[counts > 0] / counts.sum()
+    return float(-np.sum(p * np.log2(p)))
+
+
+# Texts up to this many characters are measured per code point rather
+# than per UTF-8 byte, by shannon_entropy and the batch scan alike.
+_SHORT_TEXT = 64
+
+
+def _codepoint_entropy(text: str) -> float:
+    freq = Counter(text)
+    total = len(text)
+    probs = [count / total for count in freq.values()]
+    return -sum(p * math.log2(p) for p in probs if p > 0)
+
+
 def shannon_entropy(text: str) -> float:
     """
     Estimate Shannon entropy of the given text.
     Lower values can indicate low-information / garbage (e.g., OCR noise).
+    Longer texts are measured over their UTF-8 bytes with NumPy; short
+    ones stay on the Counter path, where NumPy's call overhead dominates.
     """
     if not text:
         return 0.0
-    freq = Counter(text)
-    total = len(text)
-    probs = [count / total for count in freq.values()]
-    return -sum(p * math.log2(p) for p in probs if p > 0)
+    if len(text) > _SHORT_TEXT:
+        return _byte_entropy(_byte_histogram(text))
+    return _codepoint_entropy(text)
 
 
 def is_non_ascii_heavy(text: str, threshold_ratio: float = 0.05) -> bool:
     """
     Returns True if more than threshold_ratio of characters are non-ASCII.
     """
-    if not text:
+    # str.isascii() reads CPython's cached ASCII flag, so the common
+    # all-ASCII case returns without touching the characters.
+    if not text or text.isascii():
         return False
-    non_ascii = sum(1 for c in text if ord(c) > 127)
+    non_ascii = int(_class_counts(text)[_NON_ASCII])
     return (non_ascii / len(text)) > threshold_ratio
 
 
@@ -55,7 +199,7 @@ def punctuation_density(text: str) -> float:
     """
     if not text:
         return 0.0
-    punct = sum(1 for c in text if c in string.punctuation)
+    punct = int(_class_counts(text)[_PUNCT])
     return punct / len(text)
 
 
@@ -63,49 +207,225 @@ def newline_count(text: str) -> int:
     return text.count("\n")
 
 
+# Per-chunk statistics, one record per chunk. Densities and ratios are
+# relative to the chunk length in characters.
+SCAN_DTYPE = np.dtype([
+    ("length", "i8"),
+    ("entropy", "f4"),
+    ("newlines", "i4"),
+    ("punct", "f4"),      # punctuation density
+    ("non_ascii", "f4"),  # non-ASCII character ratio
+    ("flags", "u1"),      # LIGATURE | REPLACEMENT | HYPHEN_BREAK
+])
+LIGATURE, REPLACEMENT, HYPHEN_BREAK = 1, 2, 4
+
+SCAN_BATCH_SIZE = 512
+# Threads for the batch kernel; 1 scans inline. Part of the kernel is
+# Python that holds the GIL, so raise this only where it measures faster.
+SCAN_WORKERS = 1
+
+
+def _batched(iterable, size: int):
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _artifact_flags(text: str, has_non_ascii: bool) -> int:
+    flags = HYPHEN_BREAK if "-\n" in text else 0
+    # Ligatures and U+FFFD are non-ASCII, so chunks without a single UTF-8
+    # lead byte skip those substring searches entirely.
+    if has_non_ascii:
+        if "ﬁ" in text or "ﬂ" in text:
+            flags |= LIGATURE
+        if "\ufffd" in text:
+            flags |= REPLACEMENT
+    return flags
+
+
+def _scan_packed(texts: list[str], encoded: list[bytes]) -> np.ndarray:
+    """
+    Scan a batch of chunks at once: their UTF-8 bytes are packed into one
+    buffer and every per-chunk byte histogram comes from a single bincount.
+    Returns one SCAN_DTYPE record per chunk.
+    """
+    n = len(texts)
+    sizes = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    owner = np.repeat(np.arange(n, dtype=np.int64), sizes)
+    hist = np.bincount(owner * 256 + buf, minlength=n * 256).reshape(-1, 256)
+
+    seen = hist > 0
+    p = hist[seen] / np.repeat(sizes, seen.sum(axis=1))
+    surprisal = np.zeros(hist.shape)
+    surprisal[seen] = p * np.log2(1 / p)
+
+    entropy = surprisal.sum(axis=1)
+
+    classes = hist @ _CLASS_MATRIX
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=n)
+    per_char = np.maximum(lengths, 1)
+
+    # Same definition as shannon_entropy: short chunks are measured per
+    # code point. Bytes and code points coincide for ASCII, so only short
+    # chunks with non-ASCII characters need the Counter path.
+    short_non_ascii = (lengths <= _SHORT_TEXT) & (classes[:, _NON_ASCII] > 0)
+    for i in np.flatnonzero(short_non_ascii).tolist():
+        entropy[i] = _codepoint_entropy(texts[i])
+
+    stats = np.empty(n, dtype=SCAN_DTYPE)
+    stats["length"] = lengths
+    stats["entropy"] = entropy
+    stats["newlines"] = classes[:, _NEWLINE]
+    stats["punct"] = classes[:, _PUNCT] / per_char
+    stats["non_ascii"] = classes[:, _NON_ASCII] / per_char
+    stats["flags"] = np.fromiter(
+        map(_artifact_flags, texts, (classes[:, _NON_ASCII] > 0).tolist()),
+        dtype=np.uint8,
+        count=n,
+    )
+    return stats
+
+
+def scan(text: str) -> np.void:
+    """
+    Compute every per-chunk metric from a single UTF-8 byte histogram,
+    instead of walking the text once per metric. Returns a SCAN_DTYPE record.
+    """
+    return _scan_packed([text], [text.encode("utf-8", "ignore")])[0]
+
+
+# ---------- Corpus scan ----------
+
+@dataclass(slots=True)
+class ScanReport:
+    """
+    Per-chunk statistics and duplicate summary gathered by scan_all().
+    The arrays are parallel: index i describes the i-th document.
+    """
+    lengths: np.ndarray
+    entropies: np.ndarray
+    newline_counts: np.ndarray
+    punct_densities: np.ndarray
+    non_ascii_ratios: np.ndarray
+    flags: np.ndarray
+    repeated: list[tuple[str, int]]  # (text, count) for texts seen > 3 times
+
+
+def scan_all(docs, workers: int = SCAN_WORKERS) -> ScanReport:
+    """
+    Scan LangChain Documents in a single streaming pass. docs may be any
+    iterable (e.g. iter_pdfs); only per-chunk scalars and duplicate
+    fingerprints are kept, never the documents themselves. Only the first
+    copy of each distinct text is scanned; repeats reuse its row.
+
+    With workers > 1, batches are scanned on a thread pool with a bounded
+    number in flight; otherwise each batch is scanned inline.
+    """
+    batches = []
+    content_counts = Counter()
+    first_seen = {}
+    repeated_texts = {}
+    dup_rows, dup_sources = [], []
+    n = 0
+    in_flight = deque()
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()
+    with pool as ex:
+        for texts in _batched((d.page_content or "" for d in docs), SCAN_BATCH_SIZE):
+            fresh, encoded = [], []
+            for pos, text in enumerate(texts):
+                data = text.encode("utf-8", "ignore")
+                dig = hashlib.blake2b(data, digest_size=16).digest()
+                content_counts[dig] += 1
+                if content_counts[dig] == 1:
+                    first_seen[dig] = n + pos
+                    fresh.append(pos)
+                    encoded.append(data)
+                    continue
+                dup_rows.append(n + pos)
+                dup_sources.append(first_seen[dig])
+                # Duplicates are identical, so whichever copy crosses the
+                # "> 3" threshold can stand in as the preview text.
+                if content_counts[dig] == 4:
+                    repeated_texts[dig] = text
+            rows = np.empty(len(texts), dtype=SCAN_DTYPE)
+            batches.append(rows)
+            n += len(texts)
+
+            if ex is None:
+                rows[fresh] = _scan_packed([texts[i] for i in fresh], encoded)
+                continue
+            future = ex.submit(_scan_packed, [texts[i] for i in fresh], encoded)
+            in_flight.append((rows, fresh, future))
+            if len(in_flight) > 2 * workers:
+                rows, fresh, future = in_flight.popleft()
+                rows[fresh] = future.result()
+        for rows, fresh, future in in_flight:
+            rows[fresh] = future.result()
+
+    stats = np.concatenate(batches) if batches else np.empty(0, dtype=SCAN_DTYPE)
+    stats[dup_rows] = stats[dup_sources]
+    return ScanReport(
+        lengths=stats["length"],
+        entropies=stats["entropy"],
+        newline_counts=stats["newlines"],
+        punct_densities=stats["punct"],
+        non_ascii_ratios=stats["non_ascii"],
+        flags=stats["flags"],
+        # First-seen order, so ties in the top-5 preview break as before.
+        repeated=[
+            (repeated_texts[dig], content_counts[dig])
+            for dig in sorted(repeated_texts, key=first_seen.__getitem__)
+        ],
+    )
+
+
 # ---------- Main validator ----------
 
 def validate_docs(docs):
     """
-    Run a series of heuristic checks on a list of LangChain Documents and
-    print a human-readable cleanliness report.
+    Run a series of heuristic checks on LangChain Documents and print a
+    human-readable cleanliness report. docs may be any iterable; see
+    scan_all().
     """
 
     print("\n========== CLEANLINESS VALIDATION ==========")
 
-    if not docs:
+    report = scan_all(docs)
+    n = len(report.lengths)
+    if not n:
         print("[WARN] No documents loaded; nothing to validate.")
         return
 
+    lengths = report.lengths
+
     # ---- Basic length stats ----
-    lengths = [len(d.page_content or "") for d in docs]
-    min_len = min(lengths)
-    max_len = max(lengths)
-    avg_len = sum(lengths) / len(lengths)
-    median_len = statistics.median(lengths)
+    min_len = lengths.min()
+    max_len = lengths.max()
+    avg_len = lengths.mean()
+    median_len = np.median(lengths)
 
     print("\n[STATS] Chunk length (characters)")
-    print(f"  Count : {len(docs)}")
+    print(f"  Count : {n}")
     print(f"  Min   : {min_len}")
     print(f"  Max   : {max_len}")
     print(f"  Avg   : {avg_len:.1f}")
     print(f"  Median: {median_len:.1f}")
 
     # Flag extremes
-    very_short = [i for i, L in enumerate(lengths) if L < 50]
-    very_long = [i for i, L in enumerate(lengths) if L > 8000]
+    very_short = np.flatnonzero(lengths < 50)
+    very_long = np.flatnonzero(lengths > 8000)
 
-    if very_short:
+    if very_short.size:
         print(f"\n[WARN] {len(very_short)} chunks are very short (< 50 chars). "
-              f"Example indices: {very_short[:10]}")
-    if very_long:
+              f"Example indices: {very_short[:10].tolist()}")
+    if very_long.size:
         print(f"[WARN] {len(very_long)} chunks are very long (> 8000 chars). "
-              f"Example indices: {very_long[:10]}")
+              f"Example indices: {very_long[:10].tolist()}")
 
     # ---- Duplicate content detection ----
     print("\n[DUPLICATES] Checking for repeated chunks (exact duplicates)...")
-    content_counts = Counter(d.page_content for d in docs)
-    repeated = [(txt, c) for txt, c in content_counts.items() if c > 3]
+    repeated = report.repeated
 
     if not repeated:
         print("  No highly repeated chunks found (good).")
@@ -113,43 +433,28 @@ def validate_docs(docs):
         print(f"  Found {len(repeated)} chunk texts that repeat > 3 times.")
         print("  This may indicate headers/footers or boilerplate not removed.")
         # Show a few examples
-        for i, (txt, c) in enumerate(sorted(repeated, key=lambda x: -x[1])[:5]):
+        for i, (txt, c) in enumerate(heapq.nlargest(5, repeated, key=itemgetter(1))):
             preview = txt.replace("\n", " ")[:120]
             print(f"    #{i+1} repeat_count={c} preview='{preview}...'")
 
     # ---- Entropy analysis ----
     print("\n[ENTROPY] Checking for low-entropy (possible OCR garbage) chunks...")
-    entropies = [shannon_entropy(d.page_content or "") for d in docs]
-    low_entropy_indices = [i for i, e in enumerate(entropies) if e > 0 and e < 2.5]
+    low_entropy_indices = np.flatnonzero((report.entropies > 0) & (report.entropies < 2.5))
 
-    if low_entropy_indices:
+    if low_entropy_indices.size:
         print(f"  {len(low_entropy_indices)} chunks have low entropy (< 2.5). "
-              f"Example indices: {low_entropy_indices[:10]}")
+              f"Example indices: {low_entropy_indices[:10].tolist()}")
     else:
         print("  No obviously low-entropy chunks detected.")
 
     # ---- Weird character / OCR artifact checks ----
     print("\n[CHARS] Checking for weird / non-ASCII / OCR characters...")
 
-    ligature_pattern = re.compile(r"[ﬁﬂ]")
-    replacement_char_pattern = re.compile(r"[�]")
-    hyphen_break_pattern = re.compile(r"-\n")
-
-    ligature_hits = 0
-    replacement_hits = 0
-    hyphen_break_hits = 0
-    non_ascii_heavy_hits = 0
-
-    for d in docs:
-        text = d.page_content or ""
-        if ligature_pattern.search(text):
-            ligature_hits += 1
-        if replacement_char_pattern.search(text):
-            replacement_hits += 1
-        if hyphen_break_pattern.search(text):
-            hyphen_break_hits += 1
-        if is_non_ascii_heavy(text):
-            non_ascii_heavy_hits += 1
+    flags = report.flags
+    ligature_hits = np.count_nonzero(flags & LIGATURE)
+    replacement_hits = np.count_nonzero(flags & REPLACEMENT)
+    hyphen_break_hits = np.count_nonzero(flags & HYPHEN_BREAK)
+    non_ascii_heavy_hits = np.count_nonzero(report.non_ascii_ratios > 0.05)
 
     if ligature_hits:
         print(f"  [WARN] {ligature_hits} chunks contain ligature characters (ﬁ, ﬂ).")
@@ -166,30 +471,26 @@ def validate_docs(docs):
     # ---- Newline + punctuation diagnostics ----
     print("\n[STRUCTURE] Checking newline and punctuation patterns...")
 
-    newline_counts = [newline_count(d.page_content or "") for d in docs]
-    high_newline_indices = [i for i, n in enumerate(newline_counts) if n > 30]
+    high_newline_indices = np.flatnonzero(report.newline_counts > 30)
 
-    if high_newline_indices:
+    if high_newline_indices.size:
         print(f"  [WARN] {len(high_newline_indices)} chunks have many newlines (> 30). "
-              f"Example indices: {high_newline_indices[:10]}")
+              f"Example indices: {high_newline_indices[:10].tolist()}")
 
-    punct_densities = [punctuation_density(d.page_content or "") for d in docs]
-    low_punct_indices = [
-        i for i, (dens, L) in enumerate(zip(punct_densities, lengths))
-        if L > 300 and dens < 0.001  # long text, almost no punctuation
-    ]
+    # long text, almost no punctuation
+    low_punct_indices = np.flatnonzero((lengths > 300) & (report.punct_densities < 0.001))
 
-    if low_punct_indices:
+    if low_punct_indices.size:
         print(f"  [WARN] {len(low_punct_indices)} chunks are long but have almost no punctuation. "
-              f"May indicate poor extraction / OCR. Example indices: {low_punct_indices[:10]}")
+              f"May indicate poor extraction / OCR. Example indices: {low_punct_indices[:10].tolist()}")
     else:
         print("  Punctuation patterns look normal for most chunks.")
 
     # ---- Empty / near-empty chunks ----
-    empty_indices = [i for i, L in enumerate(lengths) if L < 5]
-    if empty_indices:
+    empty_indices = np.flatnonzero(lengths < 5)
+    if empty_indices.size:
         print(f"\n[WARN] {len(empty_indices)} chunks are empty or near-empty (< 5 chars). "
-              f"Example indices: {empty_indices[:10]}")
+              f"Example indices: {empty_indices[:10].tolist()}")
 
     print("\n========== VALIDATION COMPLETE ==========\n")
     print("Interpretation:")
@@ -202,9 +503,10 @@ def validate_docs(docs):
 # ---------- Entry point ----------
 
 if __name__ == "__main__":
-    docs = load_pdfs(path=".")
-    validate_docs(docs)
-
+    validate_docs(iter_pdfs(path="."))
 
-print(docs[8].page_content)
-print(docs[16].page_content)
\ No newline at end of file
+    # Stream again only as far as the two chunks worth eyeballing.
+    with closing(iter_pdfs(path=".")) as pages:
+        head = list(islice(pages, 17))
+    print(head[8].page_content)
+    print(head[16].page_content)
\ No newline at end of file